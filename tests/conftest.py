@@ -1,59 +1,177 @@
 """Pytest configuration and shared fixtures."""
 
+import asyncio
 from pathlib import Path
+from typing import Final
 
 import pytest
-from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage
-from langgraph_sdk import get_client
+import pytest_asyncio
+from pytest_asyncio import is_async_test
 
 # Default test model - use SiliconFlow to avoid API quota issues
 TEST_MODEL = "siliconflow:Qwen/Qwen3-8B"
 
+# Local LangGraph dev server used by e2e tests
+LANGGRAPH_URL = "http://127.0.0.1:2024"
+
+# Project root .env, resolved once at import time
+ENV_FILE: Final[Path] = Path(__file__).resolve().parent.parent / ".env"
+
+# Upper bound on threads pre-created per session; later tests create their own
+THREAD_POOL_SIZE = 8
+
+# Upper bound in seconds for a single remote call or run stream
+RUN_TIMEOUT = 120.0
+
 
 @pytest.fixture(scope="session", autouse=True)
 def load_env():
-    """Load environment variables from .env file for all tests."""
-    # Find the project root (where .env is located)
-    project_root = Path(__file__).parent.parent
-    env_file = project_root / ".env"
+    """Load environment variables from .env file for all tests.
+
+    Variables already set in the process environment (e.g. CI secrets) are
+    not overridden.
+    """
+    if ENV_FILE.is_file():
+        from dotenv import load_dotenv
 
-    if env_file.exists():
-        load_dotenv(env_file)
+        load_dotenv(ENV_FILE)
 
     # Note: Individual tests will check for their specific required keys
     # and skip appropriately. We don't globally skip all tests here.
 
 
-@pytest.fixture
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop.
+
+    Session-scoped async fixtures (LangGraph client, shared assistant) are bound to
+    the session loop, so tests consuming them must run on that same loop.
+    """
+    session_scope_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_scope_marker, append=False)
+
+
+async def bounded(awaitable, timeout: float = RUN_TIMEOUT):
+    """Await a remote call, failing fast instead of hanging on a stalled server."""
+    async with asyncio.timeout(timeout):
+        return await awaitable
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def langgraph_client():
-    """Create a LangGraph client for e2e testing."""
-    return get_client(url="http://127.0.0.1:2024")
+    """Create a LangGraph client shared by all e2e tests."""
+    from langgraph_sdk import get_client
 
+    client = get_client(url=LANGGRAPH_URL)
 
-@pytest.fixture
-async def assistant_id(langgraph_client):
-    """Create an assistant with SiliconFlow Qwen3-8B model for testing."""
-    assistant = await langgraph_client.assistants.create(
-        graph_id="agent",
-        context={
-            "model": TEST_MODEL,
-        },
+    yield client
+
+    # Close pooled connections
+    await client.aclose()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def assistant_pool(langgraph_client):
+    """Create assistants on demand, one per graph and context, for the whole session.
+
+    Yields an async ``get(graph_id, context)`` returning the assistant id; every
+    assistant created through it is deleted at session end.
+    """
+    cache: dict[tuple, str] = {}
+
+    async def get(graph_id: str, context: dict) -> str:
+        key = (graph_id, tuple(sorted(context.items())))
+        if key not in cache:
+            assistant = await bounded(
+                langgraph_client.assistants.create(graph_id=graph_id, context=context)
+            )
+            cache[key] = assistant["assistant_id"]
+        return cache[key]
+
+    yield get
+
+    # Cleanup
+    for assistant_id in cache.values():
+        try:
+            await bounded(langgraph_client.assistants.delete(assistant_id))
+        except Exception:
+            pass  # Ignore cleanup errors
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def assistant_id(assistant_pool):
+    """Provide the SiliconFlow Qwen3-8B assistant shared by the whole test session."""
+    return await assistant_pool("agent", {"model": TEST_MODEL})
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def thread_pool(request, langgraph_client):
+    """Hand out fresh threads, pre-creating them concurrently for collected tests.
+
+    Yields an async ``take()`` returning a thread id; the pool is sized to the
+    collected tests that use ``thread_id`` and every thread it creates is
+    deleted at session end.
+    """
+    wanted = sum(
+        "thread_id" in getattr(item, "fixturenames", ())
+        for item in request.session.items
     )
-    assistant_id = assistant["assistant_id"]
+    threads = await asyncio.gather(
+        *(
+            bounded(langgraph_client.threads.create())
+            for _ in range(min(wanted, THREAD_POOL_SIZE))
+        )
+    )
+    created = [thread["thread_id"] for thread in threads]
+    idle = created.copy()
+
+    async def take() -> str:
+        if idle:
+            return idle.pop()
+        thread = await bounded(langgraph_client.threads.create())
+        created.append(thread["thread_id"])
+        return thread["thread_id"]
 
-    yield assistant_id
+    yield take
 
     # Cleanup
-    try:
-        await langgraph_client.assistants.delete(assistant_id)
-    except Exception:
-        pass  # Ignore cleanup errors
+    for thread_id in created:
+        try:
+            await bounded(langgraph_client.threads.delete(thread_id))
+        except Exception:
+            pass  # Ignore cleanup errors
+
+
+@pytest_asyncio.fixture
+async def thread_id(thread_pool):
+    """Provide a fresh thread, taken from the session pool when one is left."""
+    return await thread_pool()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def deepwiki_tools():
+    """Load DeepWiki MCP tools once for the whole test session."""
+    from common.mcp import get_deepwiki_tools
+
+    return await get_deepwiki_tools()
 
 
 class TestHelpers:
     """Helper methods for common test operations."""
 
+    @staticmethod
+    def content_text(content) -> str:
+        """Return the text of message content, joining text parts of list content."""
+        if isinstance(content, list):
+            return "".join(
+                part if isinstance(part, str) else str(part.get("text", ""))
+                for part in content
+                if isinstance(part, str)
+                or (isinstance(part, dict) and part.get("type") == "text")
+            )
+        return str(content)
+
     @staticmethod
     def assert_valid_response(
         messages: list, expected_content: str | None = None, min_messages: int = 2
@@ -71,39 +189,50 @@ class TestHelpers:
         )
 
         if expected_content:
-            content = str(
-                getattr(final_message, "content", final_message.get("content", ""))
-            ).lower()
-            assert expected_content.lower() in content, (
+            content = TestHelpers.content_text(
+                final_message.get("content", "")
+                if isinstance(final_message, dict)
+                else final_message.content
+            )
+            assert expected_content.casefold() in content.casefold(), (
                 f"Expected '{expected_content}' in response content: {content[:200]}..."
             )
 
     @staticmethod
     def assert_tool_usage(messages: list, tool_name: str = "web_search"):
         """Assert that a specific tool was used in the conversation."""
-        tool_found = False
-        for msg in messages:
-            msg_dict = msg if isinstance(msg, dict) else msg.__dict__
+
+        def uses_tool(msg) -> bool:
+            if isinstance(msg, dict):
+                tool_calls = msg.get("tool_calls")
+                msg_type = msg.get("type")
+                msg_name = msg.get("name", "")
+            else:
+                tool_calls = getattr(msg, "tool_calls", None)
+                msg_type = getattr(msg, "type", None)
+                msg_name = getattr(msg, "name", "")
+
+            if not tool_calls and msg_type != "tool":
+                return False
 
             # Check for tool calls
-            if msg_dict.get("tool_calls"):
-                for call in msg_dict["tool_calls"]:
-                    if isinstance(call, dict) and call.get("name") == tool_name:
-                        tool_found = True
-                        break
+            if any(
+                isinstance(call, dict) and call.get("name") == tool_name
+                for call in tool_calls or ()
+            ):
+                return True
 
             # Check for tool messages
-            if msg_dict.get("type") == "tool" and tool_name in str(
-                msg_dict.get("name", "")
-            ):
-                tool_found = True
-                break
+            return msg_type == "tool" and tool_name in str(msg_name)
 
+        tool_found = any(uses_tool(msg) for msg in messages)
         assert tool_found, f"Tool '{tool_name}' should have been used in conversation"
 
     @staticmethod
     def create_input_state(content: str):
         """Create an InputState for testing."""
+        from langchain_core.messages import HumanMessage
+
         from react_agent.state import InputState
 
         return InputState(messages=[HumanMessage(content=content)])
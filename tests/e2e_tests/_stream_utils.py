@@ -0,0 +1,31 @@
+"""Helpers for walking updates-mode run stream chunks in e2e tests."""
+
+from collections.abc import Iterator
+
+
+def ran_tools(chunk) -> bool:
+    """Return whether an updates-mode chunk carries output from the tools node."""
+    data = chunk.data
+    return bool(data and data.get("tools"))
+
+
+def iter_node_messages(chunk) -> Iterator[tuple[str, dict]]:
+    """Yield (node_name, message) for every dict message in an updates-mode chunk.
+
+    Stream parts carry a dict payload, or None for the end event; nodes whose
+    update has no message list are skipped.
+    """
+    data = chunk.data
+    if not data:
+        return
+
+    for node_name, node_data in data.items():
+        if not isinstance(node_data, dict):
+            continue
+        messages = node_data.get("messages")
+        if not isinstance(messages, list):
+            continue
+
+        for msg in messages:
+            if isinstance(msg, dict):
+                yield node_name, msg
@@ -1,36 +1,141 @@
 """Refined end-to-end tests for DeepWiki MCP functionality with strict assertions."""
 
+import asyncio
+import re
+from dataclasses import dataclass, field
+
 import pytest
+import pytest_asyncio
+
+from ..conftest import RUN_TIMEOUT, TEST_MODEL, TestHelpers, bounded
+from ._stream_utils import iter_node_messages
+
+# DeepWiki MCP tool names, matched anywhere in the name like the original
+# substring checks (read_wiki covers read_wiki_structure/_contents)
+_DEEPWIKI_TOOL_RE = re.compile(r"read_wiki|ask_question")
+
+
+def _is_deepwiki_tool(name: str) -> bool:
+    """Return whether a tool name belongs to the DeepWiki MCP server."""
+    return _DEEPWIKI_TOOL_RE.search(name) is not None
 
-from ..conftest import TEST_MODEL
 
+@dataclass
+class StreamObservation:
+    """Tool activity observed while consuming a run stream in updates mode."""
 
-@pytest.fixture
-async def assistant_deepwiki_disabled(langgraph_client):
-    """Create an assistant with deepwiki explicitly disabled."""
-    assistant = await langgraph_client.assistants.create(
-        graph_id="agent",
-        context={
+    chunk_count: int = 0
+    tool_calls_detected: bool = False
+    deepwiki_tool_planned: bool = False
+    deepwiki_tool_executed: bool = False
+    deepwiki_tool_names_used: list[str] = field(default_factory=list)
+
+
+def _scan_chunks(chunks: list) -> StreamObservation:
+    """Scan drained updates-mode run chunks, visiting each message once."""
+    obs = StreamObservation(chunk_count=len(chunks))
+
+    for chunk in chunks:
+        # Nothing left to learn once every flag is set
+        if (
+            obs.tool_calls_detected
+            and obs.deepwiki_tool_planned
+            and obs.deepwiki_tool_executed
+        ):
+            break
+
+        for node_name, msg in iter_node_messages(chunk):
+            # Tool execution (tools node)
+            if node_name == "tools" and msg.get("type") == "tool":
+                tool_name = str(msg.get("name", ""))
+                if _is_deepwiki_tool(tool_name):
+                    obs.deepwiki_tool_executed = True
+                    obs.deepwiki_tool_names_used.append(tool_name)
+
+            # Tool planning (call_model node)
+            tool_calls = msg.get("tool_calls")
+            if tool_calls:
+                obs.tool_calls_detected = True
+                if any(
+                    isinstance(tool_call, dict)
+                    and _is_deepwiki_tool(tool_call.get("name", ""))
+                    for tool_call in tool_calls
+                ):
+                    obs.deepwiki_tool_planned = True
+
+    return obs
+
+
+async def _run_scenario(client, assistant_id: str, thread_id: str, content: str):
+    """Stream one run on a fresh thread and return its observation and final messages."""
+    # Drain the stream first so network reads aren't interleaved with scanning
+    async with asyncio.timeout(RUN_TIMEOUT):
+        chunks = [
+            chunk
+            async for chunk in client.runs.stream(
+                thread_id=thread_id,
+                assistant_id=assistant_id,
+                input={"messages": [{"role": "human", "content": content}]},
+                stream_mode="updates",
+            )
+        ]
+
+    final_state = await bounded(client.threads.get_state(thread_id))
+    return _scan_chunks(chunks), final_state["values"]["messages"]
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def assistant_deepwiki_disabled(assistant_pool):
+    """Provide the session assistant with deepwiki explicitly disabled."""
+    return await assistant_pool(
+        "agent",
+        {
             "model": TEST_MODEL,
             "enable_deepwiki": False,
             "system_prompt": "You are a helpful AI assistant.",
         },
     )
-    return assistant["assistant_id"]
 
 
-@pytest.fixture
-async def assistant_deepwiki_enabled(langgraph_client):
-    """Create an assistant with deepwiki explicitly enabled."""
-    assistant = await langgraph_client.assistants.create(
-        graph_id="agent",
-        context={
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def assistant_deepwiki_enabled(assistant_pool):
+    """Provide the session assistant with deepwiki explicitly enabled."""
+    return await assistant_pool(
+        "agent",
+        {
             "model": TEST_MODEL,
             "enable_deepwiki": True,
             "system_prompt": "You are a helpful AI assistant with access to deepwiki tools. When asked to use deepwiki tools, you must use them to get current documentation.",
         },
     )
-    return assistant["assistant_id"]
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def deepwiki_runs(
+    langgraph_client,
+    thread_pool,
+    assistant_deepwiki_disabled,
+    assistant_deepwiki_enabled,
+):
+    """Run the disabled and enabled DeepWiki scenarios concurrently, once per class."""
+    disabled_thread, enabled_thread = await asyncio.gather(thread_pool(), thread_pool())
+    disabled, enabled = await asyncio.gather(
+        # Ask a question that would normally trigger deepwiki but with deepwiki disabled
+        _run_scenario(
+            langgraph_client,
+            assistant_deepwiki_disabled,
+            disabled_thread,
+            "Look up React documentation. What are React hooks?",
+        ),
+        # Explicitly request deepwiki usage with a clear instruction
+        _run_scenario(
+            langgraph_client,
+            assistant_deepwiki_enabled,
+            enabled_thread,
+            "Use the deepwiki tools to look up React documentation and tell me what React hooks are. You MUST use deepwiki tools - do not give a generic answer.",
+        ),
+    )
+    return {"disabled": disabled, "enabled": enabled}
 
 
 class TestDeepWikiStrictE2E:
@@ -38,207 +143,57 @@ class TestDeepWikiStrictE2E:
 
     @pytest.mark.asyncio
     async def test_deepwiki_disabled_should_not_use_deepwiki_tools(
-        self, langgraph_client, assistant_deepwiki_disabled
+        self, deepwiki_runs
     ) -> None:
         """Test that deepwiki tools are NOT used when explicitly disabled."""
-        # Create a new thread
-        thread = await langgraph_client.threads.create()
-        thread_id = thread["thread_id"]
-
-        # Ask a question that would normally trigger deepwiki but with deepwiki disabled
-        input_data = {
-            "messages": [
-                {
-                    "role": "human",
-                    "content": "Look up React documentation. What are React hooks?",
-                }
-            ]
-        }
-
-        # Track execution
-        chunks = []
-        deepwiki_tool_used = False
-
-        async for chunk in langgraph_client.runs.stream(
-            thread_id=thread_id,
-            assistant_id=assistant_deepwiki_disabled,
-            input=input_data,
-            stream_mode="updates",
-        ):
-            chunks.append(chunk)
-
-            if chunk.data and isinstance(chunk.data, dict):
-                for node_name, node_data in chunk.data.items():
-                    # Check for tool usage
-                    if node_name == "tools" and node_data:
-                        if isinstance(node_data, dict) and "messages" in node_data:
-                            messages = node_data["messages"]
-                            if isinstance(messages, list):
-                                for msg in messages:
-                                    if (
-                                        isinstance(msg, dict)
-                                        and msg.get("type") == "tool"
-                                    ):
-                                        tool_name = str(msg.get("name", ""))
-                                        if any(
-                                            deepwiki_tool in tool_name
-                                            for deepwiki_tool in [
-                                                "read_wiki",
-                                                "ask_question",
-                                                "read_wiki_structure",
-                                                "read_wiki_contents",
-                                            ]
-                                        ):
-                                            deepwiki_tool_used = True
-
-                    # Check for tool calls in messages
-                    if isinstance(node_data, dict) and "messages" in node_data:
-                        messages = node_data["messages"]
-                        if isinstance(messages, list):
-                            for msg in messages:
-                                if isinstance(msg, dict) and msg.get("tool_calls"):
-                                    for tool_call in msg.get("tool_calls", []):
-                                        if isinstance(tool_call, dict):
-                                            tool_name = tool_call.get("name", "")
-                                            if any(
-                                                deepwiki_tool in tool_name
-                                                for deepwiki_tool in [
-                                                    "read_wiki",
-                                                    "ask_question",
-                                                    "read_wiki_structure",
-                                                    "read_wiki_contents",
-                                                ]
-                                            ):
-                                                deepwiki_tool_used = True
-
-        # Get final state
-        final_state = await langgraph_client.threads.get_state(thread_id)
-        messages = final_state["values"]["messages"]
+        obs, messages = deepwiki_runs["disabled"]
 
         # STRICT ASSERTIONS - No workarounds
-        assert not deepwiki_tool_used, (
+        assert not (obs.deepwiki_tool_planned or obs.deepwiki_tool_executed), (
             "DeepWiki tools should NOT be used when enable_deepwiki=False"
         )
 
         # Should still provide a response (may use web_search or knowledge)
         assert len(messages) >= 2, "Should have user message and AI response"
-        final_response = str(messages[-1]["content"])
+        final_response = TestHelpers.content_text(messages[-1]["content"])
         assert len(final_response) > 20, "Should provide a meaningful response"
 
     @pytest.mark.asyncio
     async def test_deepwiki_enabled_must_use_deepwiki_tools(
-        self, langgraph_client, assistant_deepwiki_enabled
+        self, deepwiki_runs
     ) -> None:
         """Test that deepwiki tools MUST be used when enabled and explicitly requested."""
-        # Create a new thread
-        thread = await langgraph_client.threads.create()
-        thread_id = thread["thread_id"]
-
-        # Explicitly request deepwiki usage with a clear instruction
-        input_data = {
-            "messages": [
-                {
-                    "role": "human",
-                    "content": "Use the deepwiki tools to look up React documentation and tell me what React hooks are. You MUST use deepwiki tools - do not give a generic answer.",
-                }
-            ]
-        }
-
-        # Track execution strictly
-        chunks = []
-        deepwiki_tool_planned = False
-        deepwiki_tool_executed = False
-        tool_calls_detected = False
-        deepwiki_tool_names_used = []
-
-        async for chunk in langgraph_client.runs.stream(
-            thread_id=thread_id,
-            assistant_id=assistant_deepwiki_enabled,
-            input=input_data,
-            stream_mode="updates",
-        ):
-            chunks.append(chunk)
-
-            if chunk.data and isinstance(chunk.data, dict):
-                for node_name, node_data in chunk.data.items():
-                    # Check for tool execution (tools node)
-                    if node_name == "tools" and node_data:
-                        if isinstance(node_data, dict) and "messages" in node_data:
-                            messages = node_data["messages"]
-                            if isinstance(messages, list):
-                                for msg in messages:
-                                    if (
-                                        isinstance(msg, dict)
-                                        and msg.get("type") == "tool"
-                                    ):
-                                        tool_name = str(msg.get("name", ""))
-                                        if any(
-                                            deepwiki_tool in tool_name
-                                            for deepwiki_tool in [
-                                                "read_wiki",
-                                                "ask_question",
-                                                "read_wiki_structure",
-                                                "read_wiki_contents",
-                                            ]
-                                        ):
-                                            deepwiki_tool_executed = True
-                                            deepwiki_tool_names_used.append(tool_name)
-
-                    # Check for tool planning (call_model node)
-                    if node_name == "call_model" and node_data:
-                        if isinstance(node_data, dict) and "messages" in node_data:
-                            messages = node_data["messages"]
-                            if isinstance(messages, list):
-                                for msg in messages:
-                                    if isinstance(msg, dict) and msg.get("tool_calls"):
-                                        tool_calls_detected = True
-                                        for tool_call in msg.get("tool_calls", []):
-                                            if isinstance(tool_call, dict):
-                                                tool_name = tool_call.get("name", "")
-                                                if any(
-                                                    deepwiki_tool in tool_name
-                                                    for deepwiki_tool in [
-                                                        "read_wiki",
-                                                        "ask_question",
-                                                        "read_wiki_structure",
-                                                        "read_wiki_contents",
-                                                    ]
-                                                ):
-                                                    deepwiki_tool_planned = True
-
-        # Get final state
-        final_state = await langgraph_client.threads.get_state(thread_id)
-        messages = final_state["values"]["messages"]
+        obs, messages = deepwiki_runs["enabled"]
 
         # STRICT ASSERTIONS - No fallbacks or workarounds
-        assert len(chunks) > 0, "Should receive streaming chunks"
+        assert obs.chunk_count > 0, "Should receive streaming chunks"
 
-        assert tool_calls_detected, (
+        assert obs.tool_calls_detected, (
             "Tool calls should be detected when deepwiki is enabled and requested"
         )
 
-        assert deepwiki_tool_planned, (
+        assert obs.deepwiki_tool_planned, (
             "DeepWiki tools must be planned when explicitly requested. "
             "enable_deepwiki=True was set but no deepwiki tool calls were planned."
         )
 
-        assert deepwiki_tool_executed, (
+        assert obs.deepwiki_tool_executed, (
             f"DeepWiki tools must be executed when explicitly requested. "
-            f"Tools used: {deepwiki_tool_names_used}. "
+            f"Tools used: {obs.deepwiki_tool_names_used}. "
             f"This indicates either: 1) MCP client not working, 2) Tools not loaded, "
             f"3) Agent not following instructions to use deepwiki tools."
         )
 
         # Verify response quality
-        final_response = str(messages[-1]["content"])
+        final_response = TestHelpers.content_text(messages[-1]["content"])
         assert len(final_response) > 50, (
             "Should provide substantial response when using deepwiki tools"
         )
 
         # Should mention React hooks (the requested topic)
-        final_response_lower = final_response.lower()
+        final_response_folded = final_response.casefold()
         assert any(
-            keyword in final_response_lower for keyword in ["react", "hook", "hooks"]
+            keyword in final_response_folded for keyword in ["react", "hook", "hooks"]
         ), f"Response should mention React hooks: {final_response[:200]}..."
 
         # Verify tool usage in conversation history
@@ -255,16 +210,7 @@ class TestDeepWikiStrictE2E:
         deepwiki_tool_results = [
             msg
             for msg in tool_messages
-            if isinstance(msg, dict)
-            and any(
-                deepwiki_tool in str(msg.get("name", ""))
-                for deepwiki_tool in [
-                    "read_wiki",
-                    "ask_question",
-                    "read_wiki_structure",
-                    "read_wiki_contents",
-                ]
-            )
+            if isinstance(msg, dict) and _is_deepwiki_tool(str(msg.get("name", "")))
         ]
         assert len(deepwiki_tool_results) > 0, (
             f"Should have deepwiki tool result messages. "
@@ -272,15 +218,10 @@ class TestDeepWikiStrictE2E:
         )
 
     @pytest.mark.asyncio
-    async def test_deepwiki_server_availability_check(
-        self, langgraph_client, assistant_id
-    ) -> None:
+    async def test_deepwiki_server_availability_check(self, deepwiki_tools) -> None:
         """Test to verify deepwiki server is accessible before running strict tests."""
         # This is a prerequisite test - if this fails, the environment is not ready
-        from common.mcp import get_deepwiki_tools
-
-        # Check if deepwiki tools can be loaded
-        tools = await get_deepwiki_tools()
+        tools = deepwiki_tools
 
         assert len(tools) > 0, (
             "DeepWiki MCP server must be accessible for e2e tests to run. "
@@ -300,28 +241,26 @@ class TestDeepWikiStrictE2E:
 
     @pytest.mark.asyncio
     async def test_deepwiki_configuration_persistence_e2e(
-        self, langgraph_client, assistant_id
+        self, langgraph_client, assistant_id, thread_id
     ) -> None:
         """Test that deepwiki configuration persists throughout execution."""
-        # Create a new thread
-        thread = await langgraph_client.threads.create()
-        thread_id = thread["thread_id"]
-
         # Test with deepwiki enabled configuration
         input_data = {
             "messages": [{"role": "human", "content": "Hello, please keep it brief"}],
         }
 
         # This should execute without errors even if deepwiki tools aren't used
-        result = await langgraph_client.runs.wait(
-            thread_id=thread_id,
-            assistant_id=assistant_id,
-            input=input_data,
+        result = await bounded(
+            langgraph_client.runs.wait(
+                thread_id=thread_id,
+                assistant_id=assistant_id,
+                input=input_data,
+            )
         )
 
         # Basic validation
         messages = result["messages"]
         assert len(messages) >= 2, "Should have user message and response"
 
-        final_response = str(messages[-1]["content"])
+        final_response = TestHelpers.content_text(messages[-1]["content"])
         assert len(final_response) > 0, "Should have non-empty response"
@@ -1,24 +1,27 @@
 """End-to-end tests for the LangGraph ReAct agent API."""
 
+import asyncio
 
-async def test_api_simple_question(
-    langgraph_client, assistant_id, test_helpers
-) -> None:
-    """Test agent can answer a simple question without tool usage."""
-    thread = await langgraph_client.threads.create()
-    thread_id = thread["thread_id"]
+import pytest
 
-    from tests.test_data import TestQuestions
+from ..conftest import RUN_TIMEOUT, TestHelpers, bounded
+from ..test_data import TestQuestions
+from ._stream_utils import ran_tools
 
+
+async def test_api_simple_question(langgraph_client, assistant_id, thread_id) -> None:
+    """Test agent can answer a simple question without tool usage."""
     question_data = TestQuestions.SIMPLE_MATH
     input_data = {"messages": [{"role": "human", "content": question_data["question"]}]}
 
-    result = await langgraph_client.runs.wait(
-        thread_id=thread_id, assistant_id=assistant_id, input=input_data
+    result = await bounded(
+        langgraph_client.runs.wait(
+            thread_id=thread_id, assistant_id=assistant_id, input=input_data
+        )
     )
 
     messages = result["messages"]
-    test_helpers.assert_valid_response(
+    TestHelpers.assert_valid_response(
         messages, question_data["expected_answer"], min_messages=2
     )
     assert not any(
@@ -26,11 +29,10 @@ async def test_api_simple_question(
     ), "Simple math question should not require tool usage"
 
 
-async def test_api_streaming_with_search(langgraph_client, assistant_id) -> None:
+async def test_api_streaming_with_search(
+    langgraph_client, assistant_id, thread_id
+) -> None:
     """Test agent streaming and tool usage in ReAct pattern."""
-    thread = await langgraph_client.threads.create()
-    thread_id = thread["thread_id"]
-
     input_data = {
         "messages": [
             {
@@ -40,63 +42,62 @@ async def test_api_streaming_with_search(langgraph_client, assistant_id) -> None
         ]
     }
 
-    chunks = []
+    chunk_count = 0
     tool_calls_detected = False
 
-    async for chunk in langgraph_client.runs.stream(
-        thread_id=thread_id,
-        assistant_id=assistant_id,
-        input=input_data,
-        stream_mode="updates",
-    ):
-        chunks.append(chunk)
-        if chunk.data and isinstance(chunk.data, dict):
-            for node_name, node_data in chunk.data.items():
-                if node_name == "tools" and node_data:
-                    tool_calls_detected = True
-
-    assert len(chunks) > 0, "Should receive streaming chunks"
+    async with asyncio.timeout(RUN_TIMEOUT):
+        async for chunk in langgraph_client.runs.stream(
+            thread_id=thread_id,
+            assistant_id=assistant_id,
+            input=input_data,
+            stream_mode="updates",
+        ):
+            chunk_count += 1
+            # Keep draining for the final answer, but stop inspecting once detected
+            if not tool_calls_detected:
+                tool_calls_detected = ran_tools(chunk)
+
+    assert chunk_count > 0, "Should receive streaming chunks"
     assert tool_calls_detected, "Agent should have used search tool"
 
-    final_state = await langgraph_client.threads.get_state(thread_id)
+    final_state = await bounded(langgraph_client.threads.get_state(thread_id))
     messages = final_state["values"]["messages"]
-    final_response = str(messages[-1]["content"]).lower()
+    final_response = TestHelpers.content_text(messages[-1]["content"]).casefold()
     assert any(
-        keyword in final_response for keyword in ["version", "release", "langchain"]
+        term in final_response for term in ["version", "release", "langchain"]
     ), f"Expected version/release info in response: {final_response}"
 
 
-async def test_api_thread_management(langgraph_client, assistant_id) -> None:
+async def test_api_thread_management(langgraph_client, assistant_id, thread_id) -> None:
     """Test conversation context persistence across messages."""
-    thread = await langgraph_client.threads.create()
-    thread_id = thread["thread_id"]
-
     # First message
     input1 = {"messages": [{"role": "human", "content": "My favorite color is blue."}]}
-    await langgraph_client.runs.wait(
-        thread_id=thread_id, assistant_id=assistant_id, input=input1
+    await bounded(
+        langgraph_client.runs.wait(
+            thread_id=thread_id, assistant_id=assistant_id, input=input1
+        )
     )
 
     # Second message (should maintain context)
     input2 = {"messages": [{"role": "human", "content": "What is my favorite color?"}]}
-    result2 = await langgraph_client.runs.wait(
-        thread_id=thread_id, assistant_id=assistant_id, input=input2
+    result2 = await bounded(
+        langgraph_client.runs.wait(
+            thread_id=thread_id, assistant_id=assistant_id, input=input2
+        )
     )
 
     messages = result2["messages"]
-    final_response = str(messages[-1]["content"]).lower()
+    final_response = TestHelpers.content_text(messages[-1]["content"]).casefold()
     assert "blue" in final_response, (
         "Agent should remember context from conversation history"
     )
 
 
+@pytest.mark.slow
 async def test_api_react_pattern_with_multiple_tools(
-    langgraph_client, assistant_id
+    langgraph_client, assistant_id, thread_id
 ) -> None:
     """Test the full ReAct pattern: Reasoning -> Action -> Observation."""
-    thread = await langgraph_client.threads.create()
-    thread_id = thread["thread_id"]
-
     input_data = {
         "messages": [
             {
@@ -106,27 +107,26 @@ async def test_api_react_pattern_with_multiple_tools(
         ]
     }
 
-    chunks = []
+    chunk_count = 0
     tool_calls_count = 0
 
-    async for chunk in langgraph_client.runs.stream(
-        thread_id=thread_id,
-        assistant_id=assistant_id,
-        input=input_data,
-        stream_mode="updates",
-    ):
-        chunks.append(chunk)
-        if chunk.data and isinstance(chunk.data, dict):
-            for node_name, node_data in chunk.data.items():
-                if node_name == "tools" and node_data:
-                    tool_calls_count += 1
-
-    final_state = await langgraph_client.threads.get_state(thread_id)
+    async with asyncio.timeout(RUN_TIMEOUT):
+        async for chunk in langgraph_client.runs.stream(
+            thread_id=thread_id,
+            assistant_id=assistant_id,
+            input=input_data,
+            stream_mode="updates",
+        ):
+            chunk_count += 1
+            if ran_tools(chunk):
+                tool_calls_count += 1
+
+    final_state = await bounded(langgraph_client.threads.get_state(thread_id))
     messages = final_state["values"]["messages"]
-    final_response = str(messages[-1]["content"]).lower()
+    final_response = TestHelpers.content_text(messages[-1]["content"]).casefold()
 
-    assert len(chunks) > 0, "Should receive streaming chunks"
+    assert chunk_count > 0, "Should receive streaming chunks"
     assert tool_calls_count > 0, "Agent should have made tool calls"
-    assert any(framework in final_response for framework in ["fastapi", "django"]), (
+    assert any(term in final_response for term in ["fastapi", "django"]), (
         "Response should mention the frameworks that were researched"
     )
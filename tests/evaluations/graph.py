@@ -23,6 +23,7 @@ from agentevals.graph_trajectory.llm import create_async_graph_trajectory_llm_as
 from agentevals.graph_trajectory.utils import aextract_langgraph_trajectory_from_thread
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
+from langchain_core.messages.utils import convert_to_openai_messages
 from langgraph.checkpoint.memory import MemorySaver
 from langsmith import Client
 from langsmith.evaluation import aevaluate
@@ -55,6 +56,39 @@ langsmith_client = Client()
 # Dataset configuration
 DATASET_NAME = f"{EVALUATION_CONFIG['DATASET_PREFIX']}-graph-trajectory"
 
+# Judge chat models keyed by model name, loaded once per process
+_judge_cache: Dict[str, Any] = {}
+
+
+def _get_judge(model_name: str):
+    """Return the judge chat model for model_name, loading it on first use."""
+    if model_name not in _judge_cache:
+        _judge_cache[model_name] = load_chat_model(model_name)
+    return _judge_cache[model_name]
+
+
+def _build_judge_prompt(rubric: str) -> str:
+    """Build the trajectory judge prompt for a scenario-specific rubric."""
+    return f"""You are an expert data labeler.
+Your task is to grade the accuracy of an AI agent's internal steps in resolving user queries.
+
+<Scenario-Specific Rubric>
+{rubric}
+</Scenario-Specific Rubric>
+
+<General Instructions>
+Grade the following thread, evaluating whether the agent's overall steps are logical and appropriate.
+For the trajectory, "__start__" denotes an initial entrypoint to the agent, and "__interrupt__" corresponds to the agent
+interrupting to await additional data from another source ("human-in-the-loop"):
+</General Instructions>
+
+<thread>
+{{thread}}
+</thread>
+
+{{reference_outputs}}
+"""
+
 
 class EvaluationConfig:
     """Configuration for graph trajectory evaluation."""
@@ -68,6 +102,9 @@ class EvaluationConfig:
     # Evaluator model - using shared configuration
     EVALUATOR_MODEL = EVALUATION_CONFIG["MODEL_EVALUATOR"]
 
+    # Scenarios evaluated concurrently within one model experiment
+    MAX_CONCURRENCY = 3
+
     # Test scenarios with different evaluation rubrics
     TEST_SCENARIOS = [
         {
@@ -173,15 +210,44 @@ async def run_agent_scenario(
     }
 
     try:
-        # Execute the agent conversation with context
-        result = await compiled_graph.ainvoke(
-            {"messages": [HumanMessage(content=query)]}, config=config, context=context
-        )
-
-        # Extract the trajectory
-        trajectory = await aextract_langgraph_trajectory_from_thread(
-            compiled_graph, {"configurable": {"thread_id": thread_id}}
-        )
+        graph_input = {"messages": [HumanMessage(content=query)]}
+
+        # Stream the run, recording the node path and the latest state as it goes
+        steps = ["__start__"]
+        result = None
+        async for mode, chunk in compiled_graph.astream(
+            graph_input,
+            config=config,
+            context=context,
+            stream_mode=["updates", "values"],
+        ):
+            if mode == "updates":
+                steps.extend(chunk.keys())
+            else:
+                result = chunk
+
+        if result and result.get("messages"):
+            # Same shape aextract_langgraph_trajectory_from_thread builds for a
+            # single-turn thread, without replaying the checkpointer afterwards
+            trajectory = {
+                "inputs": [{"__start__": graph_input}],
+                "outputs": {
+                    "inputs": [],
+                    "results": [
+                        {
+                            "messages": convert_to_openai_messages(
+                                [result["messages"][-1]]
+                            )
+                        }
+                    ],
+                    "steps": [steps],
+                },
+            }
+        else:
+            # Fall back to extracting the trajectory from the checkpointer
+            trajectory = await aextract_langgraph_trajectory_from_thread(
+                compiled_graph, {"configurable": {"thread_id": thread_id}}
+            )
 
         return {
             "trajectory": trajectory,
@@ -254,8 +320,8 @@ async def create_trajectory_app(model_name: str, verbose: bool = False):
         )  # Support both keys for compatibility
 
         if verbose:
-            print(f"🔧 Running trajectory evaluation: {model_name} on {scenario_name}")
-            print(f"📋 Query: {question[:100]}...")
+            print(f"[{model_name}] 🔧 Running trajectory evaluation on {scenario_name}")
+            print(f"[{model_name}] 📋 Query: {question[:100]}...")
 
         # Generate unique thread ID for this evaluation
         thread_id = (
@@ -268,7 +334,7 @@ async def create_trajectory_app(model_name: str, verbose: bool = False):
         )
 
         if verbose and "error" in trajectory_data:
-            print(f"❌ Error: {trajectory_data['error']}")
+            print(f"[{model_name}] ❌ Error: {trajectory_data['error']}")
         elif verbose:
             traj = trajectory_data.get("trajectory", {})
             steps_count = 0
@@ -276,14 +342,16 @@ async def create_trajectory_app(model_name: str, verbose: bool = False):
                 steps_count = (
                     len(traj["steps"]) if isinstance(traj["steps"], list) else 0
                 )
-            print(f"✅ Trajectory captured: {steps_count} steps")
+            print(f"[{model_name}] ✅ Trajectory captured: {steps_count} steps")
             print(
-                f"🔍 Trajectory structure: {list(traj.keys()) if isinstance(traj, dict) else 'Not a dict'}"
+                f"[{model_name}] 🔍 Trajectory structure: {list(traj.keys()) if isinstance(traj, dict) else 'Not a dict'}"
             )
             if verbose and traj:
-                print(f"🔍 Full trajectory keys: {list(traj.keys())}")
+                print(f"[{model_name}] 🔍 Full trajectory keys: {list(traj.keys())}")
                 if "outputs" in traj and "steps" in traj["outputs"]:
-                    print(f"🔍 Steps in outputs: {traj['outputs']['steps']}")
+                    print(
+                        f"[{model_name}] 🔍 Steps in outputs: {traj['outputs']['steps']}"
+                    )
 
         # Return trajectory outputs directly
         if "error" in trajectory_data:
@@ -313,9 +381,17 @@ async def create_trajectory_app(model_name: str, verbose: bool = False):
 async def create_trajectory_evaluators():
     """Create custom evaluators for trajectory assessment with scenario-specific rubrics."""
 
-    # Create scenario mapping for easy lookup
-    scenarios = {
-        scenario["name"]: scenario for scenario in EvaluationConfig.TEST_SCENARIOS
+    # Build one judge per scenario up front; rubrics and the judge model are static
+    judge_model = _get_judge(EvaluationConfig.EVALUATOR_MODEL)
+    scenario_judges = {
+        scenario["name"]: create_async_graph_trajectory_llm_as_judge(
+            prompt=_build_judge_prompt(scenario["rubric"]),
+            judge=judge_model,
+            continuous=False,
+            use_reasoning=True,
+            feedback_key="graph_trajectory_accuracy",
+        )
+        for scenario in EvaluationConfig.TEST_SCENARIOS
     }
 
     async def graph_trajectory_scenario_judge(run, example=None):
@@ -328,16 +404,13 @@ async def create_trajectory_evaluators():
                     "scenario", example.inputs.get("scene")
                 )
 
-            if not scenario_name or scenario_name not in scenarios:
+            if not scenario_name or scenario_name not in scenario_judges:
                 return {
                     "key": "graph_trajectory_accuracy",
                     "score": 0,
                     "comment": f"Unknown scenario: {scenario_name}",
                 }
 
-            # Get scenario configuration
-            scenario = scenarios[scenario_name]
-
             # Quick check for obvious failures only
             if not run or not run.outputs:
                 return {
@@ -371,35 +444,8 @@ async def create_trajectory_evaluators():
                 extracted_trajectory
             )
 
-            # Create custom prompt with scenario-specific rubric
-            custom_prompt = f"""You are an expert data labeler.
-Your task is to grade the accuracy of an AI agent's internal steps in resolving user queries.
-
-<Scenario-Specific Rubric>
-{scenario["rubric"]}
-</Scenario-Specific Rubric>
-
-<General Instructions>
-Grade the following thread, evaluating whether the agent's overall steps are logical and appropriate.
-For the trajectory, "__start__" denotes an initial entrypoint to the agent, and "__interrupt__" corresponds to the agent
-interrupting to await additional data from another source ("human-in-the-loop"):
-</General Instructions>
-
-<thread>
-{{thread}}
-</thread>
-
-{{reference_outputs}}
-"""
-
-            # Create graph trajectory judge with custom prompt
-            evaluator = create_async_graph_trajectory_llm_as_judge(
-                prompt=custom_prompt,
-                judge=load_chat_model(EvaluationConfig.EVALUATOR_MODEL),
-                continuous=False,
-                use_reasoning=True,
-                feedback_key="graph_trajectory_accuracy",
-            )
+            # Scenario-specific graph trajectory judge, built once per experiment
+            evaluator = scenario_judges[scenario_name]
 
             # Call judge directly with normalized inputs/outputs
             result = await evaluator(
@@ -428,13 +474,14 @@ async def run_model_experiment(
     dataset_name: str,
     verbose: bool = False,
 ):
-    """Run evaluation experiment for a specific model across all scenarios in dataset."""
+    """Run evaluation experiment for a specific model across all scenarios in dataset.
+
+    Nothing is printed here; the caller reports each experiment once it finishes
+    so that concurrently running experiments don't interleave their output.
+    """
     # Use full model name as experiment name
     experiment_name = model_name
 
-    print(f"🚀 Running experiment: {experiment_name}")
-    print(f"🤖 Testing model '{model_name}' on dataset with all scenarios")
-
     # Create trajectory app for this model
     app = await create_trajectory_app(model_name, verbose)
 
@@ -447,6 +494,7 @@ async def run_model_experiment(
         data=dataset_name,
         evaluators=evaluators,
         experiment_prefix=experiment_name,
+        max_concurrency=EvaluationConfig.MAX_CONCURRENCY,
         metadata={
             "model": model_name,
             "model_ai": model_name,
@@ -464,15 +512,6 @@ async def run_model_experiment(
     # Extract scores using the utils function
     extracted_scores = extract_scores_from_results(all_results)
 
-    # Print detailed score summary
-    print_scores_summary(
-        model_name=model_name,
-        extracted_scores=extracted_scores,
-        score_display_names=GRAPH_TRAJECTORY_SCORE_NAMES,
-        score_scale=100.0,
-        score_suffix="%",
-    )
-
     return {
         "experiment_name": experiment_name,
         "results": all_results,
@@ -555,8 +594,6 @@ async def main():
         models_to_run = EvaluationConfig.AGENT_MODELS
 
     # Run experiments by model (each model gets one experiment with all scenarios from dataset)
-    results = {}
-    experiment_count = 0
     total_experiments = len(models_to_run)
     total_evaluations = len(models_to_run) * len(EvaluationConfig.TEST_SCENARIOS)
 
@@ -564,19 +601,40 @@ async def main():
         f"\n🧪 Running {total_experiments} model experiments ({total_evaluations} total evaluations):"
     )
 
-    for model_name in models_to_run:
-        experiment_count += 1
-
-        print(f"\n[{experiment_count}/{total_experiments}] Testing model: {model_name}")
-
+    async def run_experiment(experiment_count: int, model_name: str):
+        header = (
+            f"\n[{experiment_count}/{total_experiments}] Testing model: {model_name}"
+        )
         try:
             result = await run_model_experiment(model_name, dataset_name, args.verbose)
-            results[model_name] = result
 
         except Exception as e:
+            # Report each experiment in one block once it is done
+            print(header)
             print(f"❌ Failed: {model_name} - {e}")
             traceback.print_exc()
-            results[model_name] = {"status": "failed", "error": str(e)}
+            return {"status": "failed", "error": str(e)}
+
+        print(header)
+        print(f"🚀 Ran experiment: {result['experiment_name']}")
+        print(f"🤖 Tested model '{model_name}' on dataset with all scenarios")
+        print_scores_summary(
+            model_name=model_name,
+            extracted_scores=result["extracted_scores"],
+            score_display_names=GRAPH_TRAJECTORY_SCORE_NAMES,
+            score_scale=100.0,
+            score_suffix="%",
+        )
+        return result
+
+    # Experiments are independent and bound by LLM latency, so run them concurrently
+    outcomes = await asyncio.gather(
+        *(
+            run_experiment(experiment_count, model_name)
+            for experiment_count, model_name in enumerate(models_to_run, start=1)
+        )
+    )
+    results = dict(zip(models_to_run, outcomes))
 
     # Use the utils function for comprehensive summary
     print_evaluation_summary(